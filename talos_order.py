@@ -23,7 +23,8 @@ Usage:
   sudo ./talos_order.py --config config.yaml --orders orders.yaml --purge-cache
 """
 
-import sys, os, re, json, hashlib, shutil, subprocess, time
+import sys, os, re, json, functools, hashlib, itertools, pickle, shlex, shutil, subprocess, time, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import urllib.request
 from urllib.error import HTTPError, URLError
 
@@ -34,6 +35,12 @@ except ImportError:
     sys.stderr.write("ERROR: PyYAML is required. Install it with:  pip install pyyaml\n")
     sys.exit(1)
 
+# Prefer libyaml C bindings (much faster); pure-Python fallback
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
 # Optional lzma (for raw.xz decompression)
 try:
     import lzma
@@ -41,58 +48,234 @@ try:
 except Exception:
     HAVE_LZMA = False
 
+# Optional urllib3 (pooled keep-alive connections); falls back to urllib.request
+try:
+    import urllib3
+    from urllib3.util.retry import Retry
+    HAVE_URLLIB3 = True
+except ImportError:
+    HAVE_URLLIB3 = False
+
 GITHUB_LATEST = "https://api.github.com/repos/siderolabs/talos/releases/latest"
 GITHUB_TAGS   = "https://api.github.com/repos/siderolabs/talos/tags"
 FACTORY_SCHEMATICS = "https://factory.talos.dev/schematics"
 
 USER_AGENT = "talos-order/1.7"
 
+# ControlMaster: the mkdir ssh opens a per-host master connection that the
+# following rsync (and later pushes within ControlPersist) multiplex over.
+# The socket lives in the user's private ~/.ssh; %C (hash of the connection
+# tuple) keeps the path short and fixed-length.
+DEFAULT_SSH_OPTS = ("-o BatchMode=yes -o ControlMaster=auto "
+                    "-o ControlPath=~/.ssh/talos-%C -o ControlPersist=60s")
+
 # ---------------- HTTP helpers ----------------
 
-def http_json(url, headers=None):
-    req = urllib.request.Request(url, headers=(headers or {"User-Agent": USER_AGENT}))
-    with urllib.request.urlopen(req) as r:
-        return json.loads(r.read().decode("utf-8"))
+# Shared keep-alive pool: repeated calls to the same host (GitHub, Factory)
+# reuse one TCP+TLS connection instead of a fresh handshake per request.
+if HAVE_URLLIB3:
+    _HTTP = urllib3.PoolManager(
+        num_pools=8,
+        maxsize=16,
+        headers={"User-Agent": USER_AGENT},
+        retries=Retry(total=3, backoff_factor=0.5),
+    )
+else:
+    _HTTP = None
+
+def _check_status(url, resp):
+    if resp.status >= 400:
+        raise RuntimeError(f"HTTP {resp.status} for {url}")
+
+def _copy_and_hash(src, dst, hasher, length=1 << 20):
+    """
+    Stream src -> dst, feeding every chunk to hasher on the way.
+    Returns the number of bytes copied.
+    """
+    size = 0
+    for buf in iter(lambda: src.read(length), b""):
+        dst.write(buf)
+        hasher.update(buf)
+        size += len(buf)
+    return size
+
+def _preallocate(f, content_length):
+    """
+    Reserve content_length bytes for f up front (Linux posix_fallocate) so
+    the filesystem can lay out large artifacts in contiguous extents.
+    Best effort: unsupported filesystems/platforms are silently skipped.
+    """
+    try:
+        n = int(content_length or 0)
+    except ValueError:
+        return
+    if n <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, n)
+    except OSError:
+        pass
 
-def http_download(url, dest_path, user_agent=USER_AGENT):
+def http_json(url, headers=None):
+    if _HTTP is None:
+        req = urllib.request.Request(url, headers=(headers or {"User-Agent": USER_AGENT}))
+        with urllib.request.urlopen(req) as r:
+            return json.loads(r.read().decode("utf-8"))
+    resp = _HTTP.request("GET", url, headers=headers)
+    _check_status(url, resp)
+    return json.loads(resp.data.decode("utf-8"))
+
+def http_json_etag(url, etag=None):
+    """
+    Conditional GET. Returns (data, etag); data is None on 304 Not Modified.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if _HTTP is None:
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req) as r:
+                return json.loads(r.read().decode("utf-8")), r.headers.get("ETag")
+        except HTTPError as e:
+            if e.code == 304:
+                return None, etag
+            raise
+    resp = _HTTP.request("GET", url, headers=headers)
+    _check_status(url, resp)
+    if resp.status == 304:
+        return None, etag
+    return json.loads(resp.data.decode("utf-8")), resp.headers.get("ETag")
+
+def http_download(url, dest_path, user_agent=USER_AGENT, hasher=None):
+    """
+    Download url to dest_path (via '.part'), hashing while streaming.
+    Returns (size_bytes, hexdigest); hasher defaults to sha256.
+    """
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
     tmp = dest_path + ".part"
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req) as r, open(tmp, "wb") as f:
-        shutil.copyfileobj(r, f)
+    if hasher is None:
+        hasher = hashlib.sha256()
+    if _HTTP is None:
+        req = urllib.request.Request(url, headers={"User-Agent": user_agent})
+        with urllib.request.urlopen(req) as r, open(tmp, "wb") as f:
+            _preallocate(f, r.headers.get("Content-Length"))
+            size = _copy_and_hash(r, f, hasher)
+            f.truncate(size)  # drop any unused preallocation
+        os.replace(tmp, dest_path)
+        return size, hasher.hexdigest()
+    resp = _HTTP.request("GET", url, headers={"User-Agent": user_agent}, preload_content=False)
+    try:
+        _check_status(url, resp)
+        with open(tmp, "wb") as f:
+            _preallocate(f, resp.headers.get("Content-Length"))
+            size = _copy_and_hash(resp, f, hasher)
+            f.truncate(size)  # drop any unused preallocation
+    finally:
+        resp.release_conn()
     os.replace(tmp, dest_path)
+    return size, hasher.hexdigest()
 
 def http_post_yaml_get_json(url: str, yaml_body: str):
-    req = urllib.request.Request(
-        url,
-        data=yaml_body.encode("utf-8"),
-        headers={"Content-Type": "application/x-yaml", "User-Agent": USER_AGENT},
-        method="POST",
-    )
-    with urllib.request.urlopen(req) as r:
-        return json.loads(r.read().decode("utf-8"))
+    headers = {"Content-Type": "application/x-yaml", "User-Agent": USER_AGENT}
+    if _HTTP is None:
+        req = urllib.request.Request(url, data=yaml_body.encode("utf-8"), headers=headers, method="POST")
+        with urllib.request.urlopen(req) as r:
+            return json.loads(r.read().decode("utf-8"))
+    resp = _HTTP.request("POST", url, body=yaml_body.encode("utf-8"), headers=headers)
+    _check_status(url, resp)
+    return json.loads(resp.data.decode("utf-8"))
 
 # ---------------- utilities ----------------
 
 def sha256_file(path):
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
+        if sys.version_info >= (3, 11):
+            # read+update loop runs in C (GIL released)
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        buf = bytearray(4 * 1024 * 1024)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
     return h.hexdigest()
 
+def _write_sha256_sidecar(path, digest):
+    """
+    Write '{path}.sha256' plus '{path}.sha256.meta' ("st_size:st_mtime_ns")
+    so later runs can trust the digest while the file is unchanged.
+    """
+    st = os.stat(path)
+    with open(path + ".sha256", "w") as sf:
+        sf.write(digest + "\n")
+    with open(path + ".sha256.meta", "w") as mf:
+        mf.write(f"{st.st_size}:{st.st_mtime_ns}\n")
+
+def _sha256_cached(path, st=None):
+    """
+    sha256 of path, taken from its sidecar if size/mtime still match;
+    otherwise recomputed and the sidecars refreshed. st: optional os.stat
+    result for path, if the caller already has one.
+    """
+    try:
+        if st is None:
+            st = os.stat(path)
+        with open(path + ".sha256.meta", "r") as mf:
+            meta = mf.read().strip()
+        with open(path + ".sha256", "r") as sf:
+            digest = sf.read().strip()
+        if meta == f"{st.st_size}:{st.st_mtime_ns}" and len(digest) == 64:
+            return digest
+    except OSError:
+        pass
+    digest = sha256_file(path)
+    _write_sha256_sidecar(path, digest)
+    return digest
+
+YAML_CACHE_DIR = ".yaml-cache"
+
+def _load_yaml_cached(path, cache_dir):
+    """
+    yaml-load path, reusing a pickled parse from cache_dir/.yaml-cache/
+    while the file's (mtime_ns, size) is unchanged.
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    name = hashlib.sha1(key[0].encode("utf-8")).hexdigest() + ".pkl"
+    pkl = os.path.join(cache_dir, YAML_CACHE_DIR, name)
+    try:
+        with open(pkl, "rb") as f:
+            stored_key, data = pickle.load(f)
+        if stored_key == key:
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+
+    with open(path, "r") as f:
+        data = yaml.load(f, Loader=_Loader)
+    try:
+        os.makedirs(os.path.dirname(pkl), exist_ok=True)
+        tmp = pkl + ".part"
+        with open(tmp, "wb") as f:
+            pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, pkl)
+    except OSError:
+        pass
+    return data
+
 def run(cmd):
     p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     return p.returncode, p.stdout.strip(), p.stderr.strip()
 
-def shlex_quote(s):
-    return "'" + s.replace("'", "'\"'\"'") + "'"
-
 # ---------------- version resolution ----------------
 
 _SEMVER_CORE = re.compile(r"^(\d+)\.(\d+)\.(\d+)$")
 
-def _semver_key(tag: str):
+@functools.lru_cache(maxsize=1024)
+def _parse_semver(tag: str):
     """
     Return a sortable key from a tag like 'v1.11.0-beta.1' or 'v1.11.0'.
     GA > pre-release. Reverse sort (key desc) yields newest GA first.
@@ -108,10 +291,44 @@ def _semver_key(tag: str):
     preflag = 0 if pre is None else -1
     return (major, minor, patch, preflag, pre or "")
 
-def resolve_version(spec):
+GITHUB_ETAG_FILE = ".github-etag.json"
+
+@functools.lru_cache(maxsize=32)
+def _cached_http_json(url, cache_dir=None):
+    """
+    GET url as JSON, memoized for the lifetime of the process.
+    With cache_dir, body + ETag are persisted in cache_dir/.github-etag.json
+    and revalidated with If-None-Match, so a 304 skips the body (and does
+    not count against GitHub's rate limit).
+    """
+    if not cache_dir:
+        return http_json(url)
+    store_path = os.path.join(cache_dir, GITHUB_ETAG_FILE)
+    try:
+        with open(store_path, "r") as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        store = {}
+    cached = store.get(url) or {}
+    data, etag = http_json_etag(url, cached.get("etag") if "body" in cached else None)
+    if data is None:
+        return cached["body"]
+    if etag:
+        store[url] = {"etag": etag, "body": data}
+        try:
+            tmp = store_path + ".part"
+            with open(tmp, "w") as f:
+                json.dump(store, f)
+            os.replace(tmp, store_path)
+        except OSError:
+            pass
+    return data
+
+def resolve_version(spec, cache_dir=None):
     """
     spec: {type: latest|exact|latest-in-minor, value?, minor?}
     returns (version_tag, source)
+    GitHub lookups are cached per run (and ETag-revalidated via cache_dir).
     """
     t = (spec or {}).get("type", "latest")
     if t == "exact":
@@ -121,7 +338,7 @@ def resolve_version(spec):
         return v, "exact"
 
     if t == "latest":
-        data = http_json(GITHUB_LATEST)
+        data = _cached_http_json(GITHUB_LATEST, cache_dir)
         tag = data.get("tag_name")
         if not tag:
             raise RuntimeError("Failed to resolve latest version from GitHub")
@@ -131,11 +348,12 @@ def resolve_version(spec):
         minor = spec.get("minor")
         if not minor:
             raise ValueError("version.type=latest-in-minor requires version.minor (e.g., v1.11)")
-        tags = http_json(GITHUB_TAGS)
-        matching = [t["name"] for t in tags if t.get("name","").startswith(minor + ".")]
+        tags = _cached_http_json(GITHUB_TAGS, cache_dir)
+        prefix = minor + "."
+        matching = [t["name"] for t in tags if t.get("name","").startswith(prefix)]
         if not matching:
             raise RuntimeError(f"No tags found for minor {minor}")
-        best = sorted(matching, key=_semver_key, reverse=True)[0]
+        best = sorted(matching, key=_parse_semver, reverse=True)[0]
         return best, "latest-in-minor"
 
     raise ValueError(f"Unknown version.type: {t}")
@@ -147,12 +365,22 @@ def post_schematic_and_get_id(customization: dict) -> str:
     Sends a minimal schematic with 'customization' section to the Factory.
     Returns the schematic ID.
     """
-    body = yaml.safe_dump({"customization": customization}, sort_keys=False)
+    body = yaml.dump({"customization": customization}, Dumper=_Dumper, sort_keys=False)
     data = http_post_yaml_get_json(FACTORY_SCHEMATICS, body)
     if "id" not in data:
         raise RuntimeError(f"Factory did not return an ID: {data}")
     return data["id"]
 
+# (platform, image_format) -> asset file name template
+_URL_TEMPLATES = {
+    ("nocloud", "iso"):    "nocloud-{arch}{sb}.iso",
+    # SecureBoot supported for raw.xz too.
+    ("nocloud", "raw.xz"): "nocloud-{arch}{sb}.raw.xz",
+    ("nocloud", "rawxz"):  "nocloud-{arch}{sb}.raw.xz",
+    ("nocloud", "raw"):    "nocloud-{arch}{sb}.raw.xz",
+    ("metal", "iso"):      "metal-{arch}.iso",
+}
+
 def build_asset_url(schematic_id, version, platform, image_format, arch, secureboot=False):
     """
     Build a download URL for the requested artifact.
@@ -160,116 +388,182 @@ def build_asset_url(schematic_id, version, platform, image_format, arch, secureb
       platform=nocloud image_format=iso|raw.xz  (both support secureboot flag)
       platform=metal   image_format=iso
     """
-    base = f"https://factory.talos.dev/image/{schematic_id}/{version}"
-
-    if platform == "nocloud":
-        if image_format == "iso":
-            name = f"nocloud-{arch}{'-secureboot' if secureboot else ''}.iso"
-        elif image_format in ("raw", "raw.xz", "rawxz"):
-            # SecureBoot supported for raw.xz too.
-            name = f"nocloud-{arch}{'-secureboot' if secureboot else ''}.raw.xz"
-        else:
+    tpl = _URL_TEMPLATES.get((platform, image_format))
+    if tpl is None:
+        if platform == "nocloud":
             raise ValueError("unsupported image_format for nocloud (use iso or raw.xz)")
-        return f"{base}/{name}"
-
-    if platform == "metal" and image_format == "iso":
-        return f"{base}/metal-{arch}.iso"
-
-    raise ValueError("unsupported platform/image_format combination")
+        raise ValueError("unsupported platform/image_format combination")
+    name = tpl.format(arch=arch, sb=("-secureboot" if secureboot else ""))
+    return f"https://factory.talos.dev/image/{schematic_id}/{version}/{name}"
 
 # ---------------- decompression ----------------
 
-def decompress_raw_xz(src_path: str, dst_path: str):
+def decompress_raw_xz(src_path: str, dst_path: str, threads=None):
     """
-    Decompress XZ to RAW using Python's lzma if available; otherwise
-    try external 'xz -dkc'. Streamed to avoid RAM blowups.
+    Decompress XZ to RAW. Prefers external 'xz -dkc -T<threads>' writing
+    straight into the destination fd (no bytes pass through Python);
+    Python's lzma is only the last resort when no 'xz' binary exists.
+    Returns (size_bytes, sha256 hexdigest) of dst_path.
     """
     os.makedirs(os.path.dirname(dst_path), exist_ok=True)
     tmp = dst_path + ".part"
+    threads = threads or os.cpu_count() or 1
 
-    if HAVE_LZMA:
-        with lzma.open(src_path, "rb") as src, open(tmp, "wb") as dst:
-            shutil.copyfileobj(src, dst, length=1024 * 1024)
+    if shutil.which("xz") is not None:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            p = subprocess.Popen(["xz", "-dkc", f"-T{threads}", src_path], stdout=fd, stderr=subprocess.PIPE)
+            _, stderr = p.communicate()
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if p.returncode != 0:
+            try: os.remove(tmp)
+            except FileNotFoundError: pass
+            raise RuntimeError(f"xz failed: {stderr.decode('utf-8', 'replace')}")
         os.replace(tmp, dst_path)
-        return
+        return size, sha256_file(dst_path)
 
-    rc, _, _ = run(["bash", "-lc", "xz --version >/dev/null 2>&1"])
-    if rc != 0:
+    if not HAVE_LZMA:
         raise RuntimeError("Cannot decompress: python lzma unavailable and 'xz' not installed")
 
-    with open(tmp, "wb") as out:
-        p = subprocess.Popen(["xz", "-dkc", src_path], stdout=out, stderr=subprocess.PIPE, text=True)
-        _, stderr = p.communicate()
-        if p.returncode != 0:
-            try: os.remove(tmp)
-            except FileNotFoundError: pass
-            raise RuntimeError(f"xz failed: {stderr}")
+    h = hashlib.sha256()
+    with lzma.open(src_path, "rb") as src, open(tmp, "wb") as dst:
+        size = _copy_and_hash(src, dst, h)
     os.replace(tmp, dst_path)
+    return size, h.hexdigest()
 
 # ---------------- push helpers ----------------
 
 def ensure_tools_for_push():
     for tool in ("rsync", "ssh"):
-        rc, _, _ = run(["bash", "-lc", f"command -v {tool}"])
-        if rc != 0:
+        if not shutil.which(tool):
             return False, f"Missing dependency: {tool}"
     return True, ""
 
-def push_file_to_hosts(local_file, hosts, default_iso_dir, rsync_opts, ssh_opts):
-    results = []
-    for h in hosts:
-        host = h["host"]
-        dest_dir = h.get("iso_dir", default_iso_dir)
-        rc, out, err = run(["bash", "-lc", f"ssh {ssh_opts} {host} 'mkdir -p {shlex_quote(dest_dir)}'"])
-        if rc != 0:
-            results.append({"host": host, "status": "mkdir-failed", "stderr": err})
-            continue
-        rc, out, err = run(["bash", "-lc", f"rsync {rsync_opts} {shlex_quote(local_file)} {host}:{shlex_quote(dest_dir)}/"])
-        results.append({"host": host, "status": ("ok" if rc == 0 else "rsync-failed"), "stderr": err})
-    return results
+def push_files_to_host(local_files, host, dest_dir, rsync_opts, ssh_opts):
+    """
+    Push all local_files to host:dest_dir with a single rsync invocation
+    (one ssh handshake + file-list scan per host instead of per file).
+    If that rsync fails, each file is retried on its own so every file
+    gets an accurate status. Returns {local_file: result}.
+    """
+    # argv lists, no local shell; the remote side of ssh still parses its command line
+    rc, out, err = run(["ssh", *shlex.split(ssh_opts), host, "mkdir", "-p", shlex.quote(dest_dir)])
+    if rc != 0:
+        return {f: {"host": host, "status": "mkdir-failed", "stderr": err} for f in local_files}
+    rsync_args = shlex.split(rsync_opts)
+    if not any(a == "-e" or a.startswith("--rsh") for a in rsync_args):
+        rsync_args += ["-e", f"ssh {ssh_opts}"]  # share ssh options (and master) with rsync
+
+    def _rsync(files):
+        rc, out, err = run(["rsync", *rsync_args, *files, f"{host}:{dest_dir}/"])
+        return {"host": host, "status": ("ok" if rc == 0 else "rsync-failed"), "stderr": err}
+
+    res = _rsync(local_files)
+    if res["status"] == "ok" or len(local_files) == 1:
+        return {f: dict(res) for f in local_files}
+    # partial failure (e.g. rsync exit 23): find out which files actually failed
+    return {f: _rsync([f]) for f in local_files}
+
+PUSH_STATE_FILE = ".push-state.json"
+
+def load_push_state(cache_dir):
+    """{"host:dest_dir": {local_file: sha256}} of previous successful pushes."""
+    try:
+        with open(os.path.join(cache_dir, PUSH_STATE_FILE), "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # best-effort cache: anything malformed is treated as empty
+    if not isinstance(state, dict):
+        return {}
+    return {k: v for k, v in state.items() if isinstance(v, dict)}
+
+def save_push_state(cache_dir, state):
+    path = os.path.join(cache_dir, PUSH_STATE_FILE)
+    tmp = path + ".part"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def push_files_to_hosts(batches, rsync_opts, ssh_opts, push_state=None, digests=None):
+    """
+    batches: {(host, dest_dir): [local_file, ...]}
+    Pushes to all hosts in parallel.
+    Returns {(host, dest_dir): {local_file: result}}.
+    With push_state/digests ({local_file: sha256}), a batch whose files were
+    all pushed before with the same sha256 is sent with --size-only (no
+    local read for delta checksums); successful pushes update push_state.
+    """
+    digests = digests or {}
+
+    def _push_one(target):
+        host, dest_dir = target
+        files = batches[target]
+        key = f"{host}:{dest_dir}"
+        known = (push_state or {}).get(key, {})
+        opts = rsync_opts
+        if push_state is not None and all(digests.get(f) and known.get(f) == digests[f] for f in files):
+            opts += " --size-only"
+        try:
+            res = push_files_to_host(files, host, dest_dir, opts, ssh_opts)
+        except Exception as e:
+            err = {"host": host, "status": "error", "stderr": f"{e.__class__.__name__}: {e}"}
+            return {f: dict(err) for f in files}
+        if push_state is not None:
+            pushed = {f: digests[f] for f in files if res[f]["status"] == "ok" and digests.get(f)}
+            push_state[key] = {**known, **pushed}
+        return res
+
+    if not batches:
+        return {}
+    if "~/.ssh/" in ssh_opts:
+        # ssh aborts if the ControlPath directory is missing
+        try:
+            os.makedirs(os.path.expanduser("~/.ssh"), mode=0o700, exist_ok=True)
+        except OSError:
+            pass
+    targets = list(batches)
+    # hosts are independent: push concurrently (executor.map preserves order)
+    with ThreadPoolExecutor(max_workers=min(len(targets), 16)) as ex:
+        return dict(zip(targets, ex.map(_push_one, targets)))
 
 # ---------------- cache management ----------------
 
 _FILE_RE   = re.compile(r"^talos-(v[^-]+)-(.*)$")  # captures version, then artifact tail
 
-def _parse_semver_for_sort(tag: str):
-    t = tag.lstrip("v")
-    parts = t.split("-", 1)
-    core = parts[0]
-    pre  = parts[1] if len(parts) > 1 else None
-    m = _SEMVER_CORE.match(core)
-    if not m:
-        return (0, 0, 0, -1 if pre else 0, pre or "")
-    major, minor, patch = (int(m.group(1)), int(m.group(2)), int(m.group(3)))
-    preflag = 0 if pre is None else -1
-    return (major, minor, patch, preflag, pre or "")
-
 def plan_cache_cleanup(cache_dir: str, keep_versions: int):
     if keep_versions <= 0:
         return []
+    # single directory scan; names collected so sidecar checks need no stat
+    names = set()
+    records = []  # (tail, semver key, name, path)
     try:
-        entries = os.listdir(cache_dir)
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                names.add(entry.name)
+                if entry.name.endswith((".sha256", ".sha256.meta")) or not entry.is_file(follow_symlinks=False):
+                    continue
+                m = _FILE_RE.match(entry.name)
+                if not m:
+                    continue
+                version_tag, tail = m.group(1), m.group(2)
+                records.append((tail, _parse_semver(version_tag), entry.name, entry.path))
     except FileNotFoundError:
         return []
-    groups = {}
-    for name in entries:
-        if name.endswith(".sha256"):
-            continue
-        m = _FILE_RE.match(name)
-        if not m:
-            continue
-        version_tag, tail = m.group(1), m.group(2)
-        full = os.path.join(cache_dir, name)
-        groups.setdefault(tail, []).append((version_tag, full))
+    # one sort over all records: grouped by tail, newest version first within a tail
+    records.sort(reverse=True)
     to_delete = []
-    for tail, items in groups.items():
-        items_sorted = sorted(items, key=lambda x: _parse_semver_for_sort(x[0]), reverse=True)
-        victims = items_sorted[keep_versions:]
-        for ver, victim in victims:
+    for tail, group in itertools.groupby(records, key=lambda r: r[0]):
+        for _, _, name, victim in itertools.islice(group, keep_versions, None):
             to_delete.append(victim)
-            sha = victim + ".sha256"
-            if os.path.exists(sha):
-                to_delete.append(sha)
+            for suffix in (".sha256", ".sha256.meta"):
+                if name + suffix in names:
+                    to_delete.append(victim + suffix)
     return to_delete
 
 def execute_cache_cleanup(paths_to_delete):
@@ -289,10 +583,10 @@ def execute_cache_cleanup(paths_to_delete):
 
 def plan_full_purge(cache_dir: str):
     try:
-        entries = [os.path.join(cache_dir, e) for e in os.listdir(cache_dir)]
+        with os.scandir(cache_dir) as it:
+            return [entry.path for entry in it]
     except FileNotFoundError:
         return []
-    return entries
 
 # ---------------- manifest path resolution ----------------
 
@@ -314,21 +608,155 @@ def manifest_path_for_order(orderid: str, manifest_cfg: dict):
 
 # ---------------- core processing ----------------
 
+def _plan_position(it, defaults, cache_dir, dry_run):
+    """
+    Resolve version, schematic and URL for one position.
+    Returns the manifest entry, or None if the position is skipped.
+    """
+    if (it.get("product") or "").lower() != "talos":
+        return None
+
+    arch = it.get("arch", defaults.get("arch", "amd64"))
+    version, version_source = resolve_version(it.get("version"), cache_dir)
+
+    # schematic
+    schematic_id = it.get("schematic_id")
+    customization = it.get("customization")
+    if not schematic_id:
+        if not customization:
+            raise ValueError("missing schematic_id or customization")
+        if dry_run:
+            schematic_id = "<to-be-created>"
+        else:
+            schematic_id = post_schematic_and_get_id(customization)
+
+    platform = it.get("platform", "nocloud")
+    secureboot = bool(it.get("secureboot", False))
+    image_format = it.get("image_format", "iso")
+    url = build_asset_url(schematic_id, version, platform, image_format, arch, secureboot)
+
+    basename = url.rstrip("/").split("/")[-1]
+    local_path = os.path.join(cache_dir, f"talos-{version}-{basename}")
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+
+    return {
+        "name": it.get("name") or "<unnamed>",
+        "product": "talos",
+        "platform": platform,
+        "arch": arch,
+        "version": version,
+        "version_source": version_source,
+        "secureboot": secureboot,
+        "image_format": image_format,
+        "schematic_id": schematic_id,
+        "url": url,
+        "cache_dir": cache_dir,
+        "download": {"path": local_path, "done": False, "sha256": None, "size_bytes": None},
+        "decompressed": {},
+        "pushed": [],
+        "features": it.get("customization", {}).get("systemExtensions", {}),
+        "timestamp_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+_PATH_LOCKS = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+def _path_lock(path):
+    # Serializes workers that target the same cached artifact.
+    with _PATH_LOCKS_GUARD:
+        return _PATH_LOCKS.setdefault(path, threading.Lock())
+
+def _execute_download(orderid, it, entry):
+    """
+    Download, checksum and decompress one planned position.
+    Mutates and returns the entry.
+    """
+    url = entry["url"]
+    local_path = entry["download"]["path"]
+    image_format = entry["image_format"]
+
+    with _path_lock(local_path):
+        # download if needed (checksum computed while streaming)
+        try:
+            st = os.stat(local_path)
+        except FileNotFoundError:
+            st = None
+        if st and st.st_size > 0:
+            print(f"[{orderid}] Cached: {local_path}")
+            digest = _sha256_cached(local_path, st)  # trusts an unchanged sidecar
+            size = st.st_size
+        else:
+            print(f"[{orderid}] Downloading {url} -> {local_path}")
+            size, digest = http_download(url, local_path)
+            _write_sha256_sidecar(local_path, digest)
+            entry["download"]["done"] = True
+
+        # checksum + size
+        entry["download"]["sha256"] = digest
+        entry["download"]["size_bytes"] = size
+
+        # decompress if requested
+        if (image_format in ("raw.xz", "rawxz")) and it.get("decompress_raw", False):
+            # preserve '-secureboot' in name
+            decompressed_path = local_path[:-3] if local_path.endswith(".xz") else local_path
+            print(f"[{orderid}] Decompressing {local_path} -> {decompressed_path}")
+            size, digest = decompress_raw_xz(local_path, decompressed_path)
+            entry["decompressed"] = {
+                "path": decompressed_path,
+                "sha256": digest,
+                "size_bytes": size,
+            }
+            _write_sha256_sidecar(decompressed_path, digest)
+
+    return entry
+
+def _push_targets(it, entry, push_settings):
+    """
+    Returns (artifact_to_push, sha256, [(host, dest_dir), ...]) for a
+    processed position; the target list is empty if pushing is disabled.
+    """
+    push_cfg = it.get("push", {}) or {}
+    push_enabled = push_cfg.get("enabled", push_settings["enabled"])
+    hosts = push_cfg.get("hosts", [])
+    prefer_decompressed = push_cfg.get("prefer_decompressed", push_settings["prefer_decompressed"])
+    decomp_path = (entry.get("decompressed") or {}).get("path")
+    if prefer_decompressed and decomp_path:
+        artifact_to_push, digest = decomp_path, entry["decompressed"].get("sha256")
+    else:
+        artifact_to_push, digest = entry["download"]["path"], entry["download"]["sha256"]
+    if not (push_enabled and hosts):
+        return artifact_to_push, digest, []
+    return artifact_to_push, digest, [(h["host"], h.get("iso_dir", push_settings["iso_dir"])) for h in hosts]
+
+def _error_entry(orderid, pos_name, e):
+    # contextual error entry
+    print(f"[{orderid}] ERROR in position '{pos_name}': {e}", file=sys.stderr)
+    return {
+        "name": pos_name,
+        "status": "error",
+        "error": f"position failed: {e.__class__.__name__}: {e}",
+    }
+
 def process_positions(orderid, positions, defaults, dry_run):
     """
     Process a list of position items (Talos artifacts) for a given orderid.
-    Returns list of entries for manifest.
+    Positions are planned sequentially, then downloaded in parallel
+    (defaults.parallel_downloads workers). Returns list of entries for manifest.
     """
     cache_dir = defaults.get("cache_dir", "/var/cache/talos-sync")
-    proxmox_default_iso_dir = defaults.get("proxmox_default_iso_dir", "/var/lib/vz/template/iso")
     os.makedirs(cache_dir, exist_ok=True)
+    parallel_downloads = max(1, int(defaults.get("parallel_downloads", 4)))
 
     # push defaults
     push_defaults = defaults.get("push", {}) or {}
     push_enabled_default = bool(push_defaults.get("enabled", False))
-    rsync_opts = push_defaults.get("rsync_opts", "-av --progress --inplace")
-    ssh_opts   = push_defaults.get("ssh_opts", "-o BatchMode=yes")
-    prefer_decompressed_default = bool(push_defaults.get("prefer_decompressed", False))
+    push_settings = {
+        "enabled": push_enabled_default,
+        "prefer_decompressed": bool(push_defaults.get("prefer_decompressed", False)),
+        "iso_dir": defaults.get("proxmox_default_iso_dir", "/var/lib/vz/template/iso"),
+        "rsync_opts": push_defaults.get("rsync_opts", "-av --progress --inplace"),
+        "ssh_opts": push_defaults.get("ssh_opts", DEFAULT_SSH_OPTS),
+    }
 
     # need push tools?
     need_push = any((it.get("push", {}).get("hosts") and (it.get("push", {}).get("enabled", push_enabled_default))) for it in positions)
@@ -337,110 +765,62 @@ def process_positions(orderid, positions, defaults, dry_run):
         if not ok:
             raise RuntimeError(msg)
 
-    entries = []
-
-    for it in positions:
+    # Phase 1: plan (sequential). Slots keep manifest order stable.
+    entries = [None] * len(positions)
+    to_download = []
+    for idx, it in enumerate(positions):
         pos_name = it.get("name") or "<unnamed>"
         try:
-            if (it.get("product") or "").lower() != "talos":
-                continue
-
-            arch = it.get("arch", defaults.get("arch", "amd64"))
-            version, version_source = resolve_version(it.get("version"))
-
-            # schematic
-            schematic_id = it.get("schematic_id")
-            customization = it.get("customization")
-            if not schematic_id:
-                if not customization:
-                    raise ValueError("missing schematic_id or customization")
-                if dry_run:
-                    schematic_id = "<to-be-created>"
-                else:
-                    schematic_id = post_schematic_and_get_id(customization)
-
-            platform = it.get("platform", "nocloud")
-            secureboot = bool(it.get("secureboot", False))
-            image_format = it.get("image_format", "iso")
-            url = build_asset_url(schematic_id, version, platform, image_format, arch, secureboot)
-
-            basename = url.rstrip("/").split("/")[-1]
-            local_path = os.path.join(cache_dir, f"talos-{version}-{basename}")
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-
-            entry = {
-                "name": pos_name,
-                "product": "talos",
-                "platform": platform,
-                "arch": arch,
-                "version": version,
-                "version_source": version_source,
-                "secureboot": secureboot,
-                "image_format": image_format,
-                "schematic_id": schematic_id,
-                "url": url,
-                "cache_dir": cache_dir,
-                "download": {"path": local_path, "done": False, "sha256": None, "size_bytes": None},
-                "decompressed": {},
-                "pushed": [],
-                "features": it.get("customization", {}).get("systemExtensions", {}),
-                "timestamp_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            }
-
-            if dry_run:
-                entries.append(entry); continue
-
-            # download if needed
-            if not (os.path.exists(local_path) and os.path.getsize(local_path) > 0):
-                print(f"[{orderid}] Downloading {url} -> {local_path}")
-                http_download(url, local_path)
-                entry["download"]["done"] = True
-            else:
-                print(f"[{orderid}] Cached: {local_path}")
-
-            # checksum + size
-            entry["download"]["sha256"] = sha256_file(local_path)
-            entry["download"]["size_bytes"] = os.path.getsize(local_path)
-            with open(local_path + ".sha256", "w") as sf:
-                sf.write(entry["download"]["sha256"] + "\n")
-
-            # decompress if requested
-            if (image_format in ("raw.xz", "rawxz")) and it.get("decompress_raw", False):
-                decompressed_path = re.sub(r"\.xz$", "", local_path)  # preserve '-secureboot' in name
-                print(f"[{orderid}] Decompressing {local_path} -> {decompressed_path}")
-                decompress_raw_xz(local_path, decompressed_path)
-                entry["decompressed"] = {
-                    "path": decompressed_path,
-                    "sha256": sha256_file(decompressed_path),
-                    "size_bytes": os.path.getsize(decompressed_path),
-                }
-                with open(decompressed_path + ".sha256", "w") as sf:
-                    sf.write(entry["decompressed"]["sha256"] + "\n")
-
-            # push?
-            push_cfg = it.get("push", {}) or {}
-            push_enabled = push_cfg.get("enabled", push_enabled_default)
-            hosts = push_cfg.get("hosts", [])
-            prefer_decompressed = push_cfg.get("prefer_decompressed", prefer_decompressed_default)
-            if push_enabled and hosts:
-                decomp_path = (entry.get("decompressed") or {}).get("path")
-                artifact_to_push = decomp_path if (prefer_decompressed and decomp_path) else entry["download"]["path"]
-                res = push_file_to_hosts(artifact_to_push, hosts, proxmox_default_iso_dir, rsync_opts, ssh_opts)
-                entry["pushed"] = res
-
-            entries.append(entry)
-
+            entry = _plan_position(it, defaults, cache_dir, dry_run)
         except Exception as e:
-            # contextual error entry
-            err_entry = {
-                "name": pos_name,
-                "status": "error",
-                "error": f"position failed: {e.__class__.__name__}: {e}",
-            }
-            entries.append(err_entry)
-            print(f"[{orderid}] ERROR in position '{pos_name}': {e}", file=sys.stderr)
-
-    return entries
+            entries[idx] = _error_entry(orderid, pos_name, e)
+            continue
+        entries[idx] = entry
+        if entry is not None and not dry_run:
+            to_download.append((idx, it, entry))
+
+    # Phase 2: download/decompress (parallel, I/O bound)
+    if to_download:
+        with ThreadPoolExecutor(max_workers=min(parallel_downloads, len(to_download))) as ex:
+            futures = {ex.submit(_execute_download, orderid, it, entry): (idx, entry)
+                       for idx, it, entry in to_download}
+            for fut in as_completed(futures):
+                idx, entry = futures[fut]
+                try:
+                    fut.result()
+                except Exception as e:
+                    entries[idx] = _error_entry(orderid, entry["name"], e)
+
+    # Phase 3: push, one rsync per (host, dest_dir) carrying all its artifacts
+    batches = {}
+    digests = {}
+    push_plan = []
+    for idx, it, entry in to_download:
+        if entries[idx] is not entry:
+            continue  # failed in phase 2
+        try:
+            artifact, digest, targets = _push_targets(it, entry, push_settings)
+        except Exception as e:
+            entries[idx] = _error_entry(orderid, entry["name"], e)
+            continue
+        digests[artifact] = digest
+        for target in targets:
+            files = batches.setdefault(target, [])
+            if artifact not in files:
+                files.append(artifact)
+        if targets:
+            push_plan.append((entry, artifact, targets))
+    if batches:
+        for (host, dest_dir), files in batches.items():
+            print(f"[{orderid}] Pushing {len(files)} artifact(s) -> {host}:{dest_dir}")
+        push_state = load_push_state(cache_dir)
+        results = push_files_to_hosts(batches, push_settings["rsync_opts"], push_settings["ssh_opts"],
+                                      push_state, digests)
+        save_push_state(cache_dir, push_state)
+        for entry, artifact, targets in push_plan:
+            entry["pushed"] = [dict(results[t][artifact]) for t in targets]
+
+    return [e for e in entries if e is not None]
 
 # ---------------- main ----------------
 
@@ -455,13 +835,16 @@ def main():
 
     # Load config
     with open(args.config, "r") as f:
-        cfg = yaml.safe_load(f) or {}
+        cfg = yaml.load(f, Loader=_Loader) or {}
     defaults = cfg.get("defaults", {}) or {}
     manifest_cfg = cfg.get("manifest", {}) or {}
 
+    cache_dir = defaults.get("cache_dir", "/var/cache/talos-sync")
+    os.makedirs(cache_dir, exist_ok=True)
+
     # Load orders: list of {orderid, customer, positions: [...]}
-    with open(args.orders, "r") as f:
-        orders_doc = yaml.safe_load(f)
+    # (parse cached under cache_dir, keyed by mtime/size)
+    orders_doc = _load_yaml_cached(args.orders, cache_dir)
     if isinstance(orders_doc, dict) and "orders" in orders_doc:
         orders_list = orders_doc["orders"]
     elif isinstance(orders_doc, list):
@@ -469,9 +852,6 @@ def main():
     else:
         raise ValueError("orders.yaml must be a list of orders or a dict with key 'orders'")
 
-    cache_dir = defaults.get("cache_dir", "/var/cache/talos-sync")
-    os.makedirs(cache_dir, exist_ok=True)
-
     # Cache policy (global)
     cache_policy = defaults.get("cache_policy", {}) or {}
     cache_enabled = bool(cache_policy.get("enabled", True))
@@ -530,10 +910,10 @@ def main():
         os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
         if args.dry_run:
             print(f"\n[DRY-RUN] Manifest for order {orderid} -> {manifest_path}")
-            yaml.safe_dump(manifest_doc, sys.stdout, sort_keys=False)
+            yaml.dump(manifest_doc, sys.stdout, Dumper=_Dumper, sort_keys=False)
         else:
             with open(manifest_path, "w") as mf:
-                yaml.safe_dump(manifest_doc, mf, sort_keys=False)
+                yaml.dump(manifest_doc, mf, Dumper=_Dumper, sort_keys=False)
             print(f"\nManifest written for order {orderid}: {manifest_path}")
 
     # Apply cache retention once at the end (global)